@@ -32,6 +32,10 @@ import Adafruit_GPIO.SPI as SPI
 # SPI_CLOCK_HZ = 64000000 # 64 MHz
 SPI_CLOCK_HZ = 4000000 # 4 MHz
 
+# Largest single transfer the spidev kernel driver accepts (default 4096).
+# Raise it with "spidev.bufsiz=65536" on the kernel command line.
+SPIDEV_BUFSIZ_PATH = '/sys/module/spidev/parameters/bufsiz'
+
 
 # Constants for interacting with display registers.
 ST7735_TFTWIDTH    = 128
@@ -112,13 +116,34 @@ def color565(r, g, b):
     """
     return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
 
-def image_to_data(image):
-    """Generator function to convert a PIL image to 16-bit 565 RGB bytes."""
+def array_to_data(array):
+    """Convert a height x width x 3 array of 8-bit RGB values to a bytes object
+    of 16-bit 565 RGB data (high byte first), ready to be written to the
+    display.
+    """
     # NumPy is much faster at doing this. NumPy code provided by:
     # Keith (https://www.blogger.com/profile/02555547344016007163)
-    pb = np.array(image.convert('RGB')).astype('uint16')
+    pb = np.asarray(array, dtype='uint16')
     color = ((pb[:,:,0] & 0xF8) << 8) | ((pb[:,:,1] & 0xFC) << 3) | (pb[:,:,2] >> 3)
-    return np.dstack(((color >> 8) & 0xFF, color & 0xFF)).flatten().tolist()
+    # Store as big-endian 16-bit words so the bytes come out high byte first
+    # without building an intermediate Python list.
+    return color.astype('>u2').tobytes()
+
+def image_to_data(image):
+    """Convert a PIL image to a bytes object of 16-bit 565 RGB data (high byte
+    first), ready to be written to the display.
+    """
+    return array_to_data(np.asarray(image.convert('RGB')))
+
+def spidev_bufsiz():
+    """Return the Linux spidev driver's per-transfer buffer size in bytes, or
+    None if it can't be read (spidev module not loaded, not Linux, etc.).
+    """
+    try:
+        with open(SPIDEV_BUFSIZ_PATH) as f:
+            return int(f.read())
+    except (IOError, OSError, ValueError):
+        return None
 
 # Define a function to hard code that we are using a raspberry pi
 def get_platform_gpio_for_pi(**keywords):
@@ -129,11 +154,12 @@ class ST7735(object):
     """Representation of an ST7735 TFT LCD."""
 
     def __init__(self, dc, spi, rst=None, gpio=None, width=ST7735_TFTWIDTH,
-        height=ST7735_TFTHEIGHT):
+        height=ST7735_TFTHEIGHT, spi_clock_hz=SPI_CLOCK_HZ):
         """Create an instance of the display using SPI communication.  Must
         provide the GPIO pin number for the D/C pin and the SPI driver.  Can
         optionally provide the GPIO pin number for the reset pin as the rst
-        parameter.
+        parameter, and the SPI clock to run the display at as spi_clock_hz
+        (default 4 MHz; most panels are fine at 16-32 MHz with short wires).
         """
         self._dc = dc
         self._rst = rst
@@ -152,21 +178,45 @@ class ST7735(object):
         # Set SPI to mode 0, MSB first.
         spi.set_mode(0)
         spi.set_bit_order(SPI.MSBFIRST)
-        spi.set_clock_hz(SPI_CLOCK_HZ)
+        spi.set_clock_hz(spi_clock_hz)
+        # Display writes are one-way, so use spidev's writebytes2 when the
+        # SPI object wraps a spidev device that has it.  It takes any buffer
+        # without converting it to a list of ints and splits it into
+        # transfers itself.
+        self._writebytes2 = getattr(getattr(spi, '_device', None), 'writebytes2', None)
+        # Otherwise write in chunks the list-based spidev.writebytes accepts:
+        # py-spidev rejects more than 4096 bytes per call whatever the
+        # kernel's bufsiz, so a larger bufsiz only helps writebytes2.
+        self._chunk_size = min(spidev_bufsiz() or 4096, 4096)
+        # Last address window sent by set_window (unknown until then).
+        self._window = None
         # Create an image buffer.
         self.buffer = Image.new('RGB', (width, height))
 
-    def send(self, data, is_data=True, chunk_size=4096):
+    def send(self, data, is_data=True, chunk_size=None):
         """Write a byte or array of bytes to the display. Is_data parameter
         controls if byte should be interpreted as display data (True) or command
         data (False).  Chunk_size is an optional size of bytes to write in a
-        single SPI transaction, with a default of 4096.
+        single SPI transaction.  If it isn't given, byte buffers go to
+        writebytes2 in one call (spidev splits them itself) and anything else
+        is written in chunks of the default size.
         """
         # Set DC low for command, high for data.
         self._gpio.output(self._dc, is_data)
         # Convert scalar argument to list so either can be passed as parameter.
         if isinstance(data, numbers.Number):
             data = [data & 0xFF]
+        # Hand byte buffers to spidev without converting them to lists.
+        if self._writebytes2 is not None and isinstance(data, (bytes, bytearray, memoryview)):
+            if chunk_size is None:
+                self._writebytes2(data)
+                return
+            view = memoryview(data)
+            for start in range(0, len(view), chunk_size):
+                self._writebytes2(view[start:start+chunk_size])
+            return
+        if chunk_size is None:
+            chunk_size = self._chunk_size
         # Write data a chunk at a time.
         for start in range(0, len(data), chunk_size):
             end = min(start+chunk_size, len(data))
@@ -313,6 +363,7 @@ class ST7735(object):
         """
         self.reset()
         self._init()
+        self._window = None
 
     def set_window(self, x0=0, y0=0, x1=None, y1=None):
         """Set the pixel address window for proceeding drawing commands. x0 and
@@ -325,16 +376,18 @@ class ST7735(object):
             x1 = self.width-1
         if y1 is None:
             y1 = self.height-1
-        self.command(ST7735_CASET)        # Column addr set
-        self.data(x0 >> 8)
-        self.data(x0)                    # XSTART
-        self.data(x1 >> 8)
-        self.data(x1)                    # XEND
-        self.command(ST7735_RASET)        # Row addr set
-        self.data(y0 >> 8)
-        self.data(y0)                    # YSTART
-        self.data(y1 >> 8)
-        self.data(y1)                    # YEND
+        # Each window argument goes out as one 4-byte transfer, and CASET/RASET
+        # are skipped when the window is unchanged (RAMWR alone rewinds the
+        # RAM pointer to the window's start).
+        window = (x0, y0, x1, y1)
+        if window != self._window:
+            self.command(ST7735_CASET)        # Column addr set
+            self.data(bytearray((x0 >> 8 & 0xFF, x0 & 0xFF,      # XSTART
+                                 x1 >> 8 & 0xFF, x1 & 0xFF)))    # XEND
+            self.command(ST7735_RASET)        # Row addr set
+            self.data(bytearray((y0 >> 8 & 0xFF, y0 & 0xFF,      # YSTART
+                                 y1 >> 8 & 0xFF, y1 & 0xFF)))    # YEND
+            self._window = window
         self.command(ST7735_RAMWR)        # write to RAM
 
     def display(self, image=None):
@@ -352,10 +405,55 @@ class ST7735(object):
         # Unfortunate that this copy has to occur, but the SPI byte writing
         # function needs to take an array of bytes and PIL doesn't natively
         # store images in 16-bit 565 RGB format.
-        pixelbytes = list(image_to_data(image))
+        pixelbytes = image_to_data(image)
         # Write data to hardware.
         self.data(pixelbytes)
 
+    def display_raw(self, data):
+        """Write pre-converted 16-bit 565 RGB bytes (as returned by
+        image_to_data) for the entire display to the hardware.
+        """
+        # Set address bounds to entire display.
+        self.set_window()
+        # Write data to hardware.
+        self.data(data)
+
+    def display_raw_diff(self, data, prev, gap=4):
+        """Like display_raw, but only write the part of data that differs from
+        prev (the bytes last written to the display).  Dirty rows separated by
+        at most gap clean rows are grouped, and each group is sent as one
+        window trimmed to the columns that changed in it.  Falls back to a
+        full write when prev is None or more than half the rows changed.
+        """
+        row = self.width * 2
+        if prev is None or len(prev) != len(data):
+            self.display_raw(data)
+            return
+        cur = np.frombuffer(data, dtype=np.uint8).reshape(-1, row)
+        old = np.frombuffer(prev, dtype=np.uint8).reshape(-1, row)
+        # Per-pixel dirty map (either byte of the RGB565 word changed).
+        changed = (cur != old).reshape(-1, self.width, 2).any(axis=2)
+        dirty = np.flatnonzero(changed.any(axis=1))
+        if len(dirty) == 0:
+            return
+        if len(dirty) > self.height // 2:
+            self.display_raw(data)
+            return
+        # Group dirty rows into [start, end] runs.
+        breaks = np.flatnonzero(np.diff(dirty) > gap + 1)
+        starts = np.concatenate(([dirty[0]], dirty[breaks + 1]))
+        ends = np.concatenate((dirty[breaks], [dirty[-1]]))
+        view = memoryview(data)
+        for y0, y1 in zip(starts.tolist(), ends.tolist()):
+            cols = np.flatnonzero(changed[y0:y1+1].any(axis=0))
+            x0, x1 = int(cols[0]), int(cols[-1])
+            self.set_window(x0, y0, x1, y1)
+            if x0 == 0 and x1 == self.width-1:
+                # Full-width rows are contiguous in data: no copy.
+                self.data(view[y0*row:(y1+1)*row])
+            else:
+                self.data(cur[y0:y1+1, x0*2:(x1+1)*2].tobytes())
+
     def clear(self, color=(0,0,0)):
         """Clear the image buffer to the specified RGB color (default black)."""
         width, height = self.buffer.size
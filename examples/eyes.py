@@ -4,33 +4,72 @@
 # Draws 160x128 landscape, then rotates to 128x160 portrait for this driver.
 
 import time, math, random, signal
-from PIL import Image, ImageDraw, Image as PILImage
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, ImageDraw
 import ST7735 as TFT
 import Adafruit_GPIO.SPI as SPI
 
+try:
+    from numba import njit   # optional: JIT the RGB565 pack below
+except ImportError:
+    njit = None
+
 # ---------------- Display config (same style as your other scripts) ----------------
-BAUD = 16_000_000
+BAUD = 32_000_000  # drop to 16_000_000 if long wires show corrupt pixels
 LAND_W, LAND_H = 160, 128          # draw in landscape
 PORTRAIT_W, PORTRAIT_H = 128, 160  # driver expects portrait
 OFF_X, OFF_Y = 2, 1                # software offsets to hide the “L” border
 FLIP_LEFT_180 = True               # keep your left panel flipped
 
-LEFT  = TFT.ST7735(25, rst=23, spi=SPI.SpiDev(0, 0, max_speed_hz=BAUD)); LEFT.begin()
-RIGHT = TFT.ST7735(24, rst=18, spi=SPI.SpiDev(0, 1, max_speed_hz=BAUD)); RIGHT.begin()
+# A full frame is 128*160*2 = 40960 bytes; with spidev's default 4096-byte
+# bufsiz it goes out as 10 transfers. Add "spidev.bufsiz=65536" to
+# /boot/cmdline.txt (or load spidev with bufsiz=65536) to send it in one.
+_bufsiz = TFT.spidev_bufsiz()
+if _bufsiz is not None and _bufsiz < PORTRAIT_W * PORTRAIT_H * 2:
+    print(f"WARNING: spidev bufsiz is {_bufsiz}, each frame needs several SPI transfers (set spidev.bufsiz=65536)")
+
+LEFT  = TFT.ST7735(25, rst=23, spi=SPI.SpiDev(0, 0, max_speed_hz=BAUD), spi_clock_hz=BAUD); LEFT.begin()
+RIGHT = TFT.ST7735(24, rst=18, spi=SPI.SpiDev(0, 1, max_speed_hz=BAUD), spi_clock_hz=BAUD); RIGHT.begin()
 
-def _soft_offset(img):
-    if OFF_X == 0 and OFF_Y == 0:
-        return img
-    pad = Image.new("RGB", (PORTRAIT_W + OFF_X, PORTRAIT_H + OFF_Y), (0, 0, 0))
-    pad.paste(img, (OFF_X, OFF_Y))
-    return pad.crop((0, 0, PORTRAIT_W, PORTRAIT_H))
+# Persistent portrait buffers (one per panel); the border strips left by the
+# soft offset are zeroed once here and never written again.
+_scratch_left  = np.zeros((PORTRAIT_H, PORTRAIT_W, 3), dtype=np.uint8)
+_scratch_right = np.zeros((PORTRAIT_H, PORTRAIT_W, 3), dtype=np.uint8)
+# Packed RGB565 output per panel (only used by the numba path)
+_packed_left  = np.empty(PORTRAIT_W * PORTRAIT_H * 2, dtype=np.uint8)
+_packed_right = np.empty(PORTRAIT_W * PORTRAIT_H * 2, dtype=np.uint8)
 
-def to_panel_frame(canvas_land, flip_180=False):
-    frame = canvas_land.transpose(PILImage.ROTATE_270)  # landscape -> portrait
-    frame = _soft_offset(frame)
-    if flip_180:
-        frame = frame.transpose(PILImage.ROTATE_180)
-    return frame
+if njit is not None:
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def image_to_data_numba(arr, out):
+        # Single pass RGB888 -> RGB565 (high byte first), no temporaries
+        h, w = arr.shape[0], arr.shape[1]
+        for y in range(h):
+            for x in range(w):
+                r = arr[y, x, 0]; g = arr[y, x, 1]; b = arr[y, x, 2]
+                c = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+                i = 2 * (y * w + x)
+                out[i] = c >> 8
+                out[i + 1] = c & 0xFF
+else:
+    image_to_data_numba = None
+
+def to_panel_bytes(canvas_land, flip_180, scratch, packed):
+    """
+    Landscape eye (array or image) -> packed RGB565 bytes for the panel.
+    Rotate (ROTATE_270), soft offset and optional 180° flip are views/slice
+    writes into 'scratch', so no intermediate PIL images are allocated.
+    Packs with numba into 'packed' when available, else with the driver's
+    NumPy packer.
+    """
+    r = np.rot90(np.asarray(canvas_land), k=-1)  # == ROTATE_270
+    scratch[OFF_Y:, OFF_X:] = r[:PORTRAIT_H - OFF_Y, :PORTRAIT_W - OFF_X]
+    frame = scratch[::-1, ::-1] if flip_180 else scratch
+    if image_to_data_numba is None:
+        return TFT.array_to_data(frame)
+    image_to_data_numba(frame, packed)
+    return packed.tobytes()
 
 # ---------------- Eye parameters ----------------
 BG = (15, 18, 22)          # panel background
@@ -38,6 +77,7 @@ SCLERA = (245, 245, 245)   # eye white
 IRIS = (80, 180, 255)      # iris ring
 PUPIL = (20, 20, 20)       # pupil
 LID = (15, 18, 22)         # eyelid color (same as BG so it looks like blinking)
+OUTLINE = (40, 40, 50)     # outer outline ring
 
 FPS = 200
 DT = 1.0 / FPS
@@ -62,43 +102,164 @@ def _sigint(_sig, _frm):
     running = False
 signal.signal(signal.SIGINT, _sigint)
 
-def draw_eye_frame(w, h, t, phase, blink_amt):
-    """
-    Draw a single eye (160x128) with a wandering pupil.
-    - t: time (sec)
-    - phase: horizontal phase (set same for both to sync)
-    - blink_amt: 0=open .. 1=fully closed
-    """
+def _draw_outline(d, color=OUTLINE):
+    d.ellipse((EYE_CX - EYE_R, EYE_CY - EYE_R, EYE_CX + EYE_R, EYE_CY + EYE_R), outline=color, width=2)
+
+def _build_eye_template(w, h):
+    # Background, sclera and outline never move, so draw them once and copy per frame
     img = Image.new("RGB", (w, h), BG)
     d = ImageDraw.Draw(img)
-
-    # Sclera
     d.ellipse((EYE_CX - EYE_R, EYE_CY - EYE_R, EYE_CX + EYE_R, EYE_CY + EYE_R), fill=SCLERA)
+    _draw_outline(d)
+    return img
+
+_EYE_TEMPLATE = _build_eye_template(LAND_W, LAND_H)
+
+# Pixels covered by the outline, so it can be restored on top of the lids
+_outline_img = Image.new("L", (LAND_W, LAND_H), 0)
+_draw_outline(ImageDraw.Draw(_outline_img), color=255)
+_OUTLINE_MASK = np.asarray(_outline_img) > 0
 
-    # Pupil target path (gentle Lissajous)
+def _disc_stamp(size, color):
+    # Filled circle in a size x size RGBA tile (transparent outside); pasted
+    # through its own alpha it matches d.ellipse on the same bbox
+    stamp = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    ImageDraw.Draw(stamp).ellipse((0, 0, size - 1, size - 1), fill=color + (255,))
+    return stamp
+
+# Iris, pupil and highlight only translate frame to frame, so rasterize them
+# once and paste them instead of drawing ellipses every frame
+HL_SIZE = 7
+_IRIS_STAMP  = _disc_stamp(2 * IRIS_R + 1, IRIS)
+_PUPIL_STAMP = _disc_stamp(2 * PUPIL_R + 1, PUPIL)
+_HL          = _disc_stamp(HL_SIZE, (255, 255, 255))
+
+def pupil_position(t, phase):
+    """Pupil center (integer pixels) on a gentle Lissajous path at time t."""
     tx = math.sin(t * 0.8 + phase) * 0.8
     ty = math.sin(t * 1.1 + phase * 1.2) * 0.6
-    px = EYE_CX + int(PUPIL_MAX * tx)
-    py = EYE_CY + int(PUPIL_MAX * ty)
+    return EYE_CX + int(PUPIL_MAX * tx), EYE_CY + int(PUPIL_MAX * ty)
+
+def lid_cover(h, blink_amt):
+    """Rows each lid has closed past the middle, or None when the eye is open."""
+    if blink_amt > 0.0:
+        return int((h // 2) * blink_amt)
+    return None
+
+def lid_rows(h, cover):
+    """(top, bot): rows [0, top) and [bot, h) are lid; (0, h) when open."""
+    if cover is None:
+        return 0, h
+    return max(0, (h // 2) - cover + 1), (h // 2) + cover
+
+def draw_eye_frame(w, h, px, py, cover):
+    """
+    Draw a single eye (160x128) with the pupil at (px, py).
+    Returns an (h, w, 3) uint8 RGB array.
+    - px, py: pupil center, see pupil_position()
+    - cover: lid_cover() result (None = open)
+    """
+    # Background + sclera + outline come pre-drawn from the template
+    img = _EYE_TEMPLATE.copy()
 
     # Iris ring
-    d.ellipse((px - IRIS_R, py - IRIS_R, px + IRIS_R, py + IRIS_R), fill=IRIS)
+    img.paste(_IRIS_STAMP, (px - IRIS_R, py - IRIS_R), _IRIS_STAMP)
     # Pupil
-    d.ellipse((px - PUPIL_R, py - PUPIL_R, px + PUPIL_R, py + PUPIL_R), fill=PUPIL)
+    img.paste(_PUPIL_STAMP, (px - PUPIL_R, py - PUPIL_R), _PUPIL_STAMP)
 
     # Subtle specular highlight
-    d.ellipse((px - PUPIL_R//2 - 6, py - PUPIL_R//2 - 6, px - PUPIL_R//2, py - PUPIL_R//2), fill=(255,255,255))
+    img.paste(_HL, (px - PUPIL_R//2 - (HL_SIZE - 1), py - PUPIL_R//2 - (HL_SIZE - 1)), _HL)
 
-    # Eyelids (blink): draw two rectangles that meet in the middle as blink_amt goes to 1
-    if blink_amt > 0.0:
-        cover = int((h // 2) * blink_amt)
-        d.rectangle((0, 0, w, (h // 2) - cover), fill=LID)                  # upper lid
-        d.rectangle((0, (h // 2) + cover, w, h), fill=LID)                  # lower lid
+    arr = np.array(img)
 
-    # Outer outline
-    d.ellipse((EYE_CX - EYE_R, EYE_CY - EYE_R, EYE_CX + EYE_R, EYE_CY + EYE_R), outline=(40, 40, 50), width=2)
+    # Eyelids (blink): two full-width row bands that meet in the middle as
+    # blink_amt goes to 1 (same rows the old inclusive rectangles covered)
+    if cover is not None:
+        top, bot = lid_rows(h, cover)
+        arr[:top] = LID                                                     # upper lid
+        arr[bot:] = LID                                                     # lower lid
+        # Outer outline (lids painted over the template's copy)
+        arr[:top][_OUTLINE_MASK[:top]] = OUTLINE
+        arr[bot:][_OUTLINE_MASK[bot:]] = OUTLINE
 
-    return img
+    return arr
+
+if njit is not None:
+    # Static layers as lookup tables for the fused kernel: the template
+    # pre-packed to RGB565 and the stamps' coverage masks, so the kernel
+    # output matches the PIL path pixel for pixel
+    _TEMPLATE_565 = np.frombuffer(TFT.image_to_data(_EYE_TEMPLATE), dtype='>u2') \
+                      .reshape(LAND_H, LAND_W).astype(np.uint16)
+    _IRIS_MASK  = np.asarray(_IRIS_STAMP)[:, :, 3] > 0
+    _PUPIL_MASK = np.asarray(_PUPIL_STAMP)[:, :, 3] > 0
+    _HL_MASK    = np.asarray(_HL)[:, :, 3] > 0
+    _IRIS_565    = TFT.color565(*IRIS)
+    _PUPIL_565   = TFT.color565(*PUPIL)
+    _HL_565      = TFT.color565(255, 255, 255)
+    _LID_565     = TFT.color565(*LID)
+    _OUTLINE_565 = TFT.color565(*OUTLINE)
+
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def render_eye(template, outline, iris, pupil, hl, px, py, top, bot, flip_180, out):
+        # Draw + ROTATE_270 + soft offset + optional 180° flip + RGB565 pack in
+        # one pass: walk the portrait panel and look each pixel up in landscape
+        land_h = template.shape[0]
+        ir = iris.shape[0] // 2
+        pr = pupil.shape[0] // 2
+        hs = hl.shape[0]
+        hx = px - pr // 2 - (hs - 1)
+        hy = py - pr // 2 - (hs - 1)
+        for i in range(PORTRAIT_H):
+            for j in range(PORTRAIT_W):
+                si = PORTRAIT_H - 1 - i if flip_180 else i
+                sj = PORTRAIT_W - 1 - j if flip_180 else j
+                if si < OFF_Y or sj < OFF_X:
+                    c = 0                              # soft offset margin
+                else:
+                    x = si - OFF_Y
+                    y = land_h - 1 - (sj - OFF_X)
+                    if y < top or y >= bot:
+                        c = _OUTLINE_565 if outline[y, x] else _LID_565
+                    elif 0 <= x - hx < hs and 0 <= y - hy < hs and hl[y - hy, x - hx]:
+                        c = _HL_565
+                    elif abs(x - px) <= pr and abs(y - py) <= pr and pupil[y - py + pr, x - px + pr]:
+                        c = _PUPIL_565
+                    elif abs(x - px) <= ir and abs(y - py) <= ir and iris[y - py + ir, x - px + ir]:
+                        c = _IRIS_565
+                    else:
+                        c = template[y, x]
+                k = 2 * (i * PORTRAIT_W + j)
+                out[k] = c >> 8
+                out[k + 1] = c & 0xFF
+
+    def eye_panel_bytes(pos, cover, flip_180, packed):
+        """Packed RGB565 panel frame for one eye, rendered by the fused kernel."""
+        top, bot = lid_rows(LAND_H, cover)
+        render_eye(_TEMPLATE_565, _OUTLINE_MASK, _IRIS_MASK, _PUPIL_MASK, _HL_MASK,
+                   pos[0], pos[1], top, bot, flip_180, packed)
+        return packed.tobytes()
+else:
+    eye_panel_bytes = None
+
+def panel_jobs(left_pos, right_pos, cover):
+    """
+    (device, fn, args) per panel; fn(*args) returns that panel's packed frame.
+    Uses the fused numba kernel when available, else draws each distinct eye
+    once with PIL/NumPy and packs it with to_panel_bytes().
+    """
+    if eye_panel_bytes is not None:
+        return ((LEFT,  eye_panel_bytes, (left_pos,  cover, FLIP_LEFT_180, _packed_left)),
+                (RIGHT, eye_panel_bytes, (right_pos, cover, False,         _packed_right)))
+    left_land = draw_eye_frame(LAND_W, LAND_H, *left_pos, cover)
+    if right_pos == left_pos:
+        right_land = left_land
+    else:
+        right_land = draw_eye_frame(LAND_W, LAND_H, *right_pos, cover)
+    return ((LEFT,  to_panel_bytes, (left_land,  FLIP_LEFT_180, _scratch_left,  _packed_left)),
+            (RIGHT, to_panel_bytes, (right_land, False,         _scratch_right, _packed_right)))
+
+# Single worker: overlaps one panel's RGB565 packing with the other's SPI push
+_pack_pool = ThreadPoolExecutor(max_workers=1)
 
 def eye_anim_loop():
     # One shared blink schedule for perfect sync
@@ -129,6 +290,8 @@ def eye_anim_loop():
             return ("opening", t_start, prog), next_blink
         return state, next_blink
 
+    next_t = time.monotonic()  # wake-up deadline for the next frame
+    last_key = None            # (left pupil, right pupil, lid cover) last pushed
     while running:
         now = time.monotonic()
         t = now - t0
@@ -137,25 +300,36 @@ def eye_anim_loop():
         blink_state, next_blink = update_blink(now, next_blink, blink_state)
         blink_amt = blink_state[2]
 
-        # Same pupil motion phase for both
-        phase = 0.0
-        left_land  = draw_eye_frame(LAND_W, LAND_H, t, phase=phase, blink_amt=blink_amt)
-        right_land = draw_eye_frame(LAND_W, LAND_H, t, phase=phase, blink_amt=blink_amt)
+        # Same pupil motion phase for both, so one render serves both panels
+        phase_left = phase_right = 0.0
+        left_pos  = pupil_position(t, phase_left)
+        right_pos = left_pos if phase_right == phase_left else pupil_position(t, phase_right)
+        cover = lid_cover(LAND_H, blink_amt)
 
-        # Convert to panel frames
-        left_frame  = to_panel_frame(left_land,  flip_180=FLIP_LEFT_180)
-        right_frame = to_panel_frame(right_land, flip_180=False)
+        # Pixels only depend on integer pupil positions and lid cover; at this
+        # frame rate many frames repeat exactly, so skip drawing and SPI then
+        key = (left_pos, right_pos, cover)
+        if key != last_key:
+            last_key = key
+            left, right = panel_jobs(left_pos, right_pos, cover)
 
-        # Alternate push order each frame to avoid a constant lead
-        if swap:
-            RIGHT.display(right_frame)
-            LEFT.display(left_frame)
-        else:
-            LEFT.display(left_frame)
-            RIGHT.display(right_frame)
-        swap = not swap
+            # Alternate push order each frame to avoid a constant lead
+            first, second = (right, left) if swap else (left, right)
 
-        time.sleep(DT)
+            # Pack the second panel's frame on the worker while the first one is
+            # on the wire (the SPI write and the numba/NumPy pack release the GIL)
+            pending = _pack_pool.submit(second[1], *second[2])
+            first[0].display_raw(first[1](*first[2]))
+            second[0].display_raw(pending.result())
+            swap = not swap
+
+        # Pace on a fixed schedule so render/SPI time isn't added on top of DT
+        next_t += DT
+        slack = next_t - time.monotonic()
+        if slack > 0:
+            time.sleep(slack)
+        else:
+            next_t = time.monotonic()  # overran: resync instead of bursting to catch up
 
 def main():
     try:
@@ -163,17 +337,13 @@ def main():
     finally:
         # On exit, quick “surprised blink” and calm stare
         for amt in [0.0, 0.4, 0.8, 1.0, 0.6, 0.2, 0.0]:
-            t = time.monotonic()
-            left_land  = draw_eye_frame(LAND_W, LAND_H, t, phase=0.0, blink_amt=amt)
-            right_land = draw_eye_frame(LAND_W, LAND_H, t, phase=0.0, blink_amt=amt)
-            LEFT.display( to_panel_frame(left_land,  flip_180=FLIP_LEFT_180) )
-            RIGHT.display(to_panel_frame(right_land, flip_180=False))
+            pos = pupil_position(time.monotonic(), 0.0)
+            for dev, fn, args in panel_jobs(pos, pos, lid_cover(LAND_H, amt)):
+                dev.display_raw(fn(*args))
             time.sleep(0.05)
-        t = time.monotonic()
-        left_land  = draw_eye_frame(LAND_W, LAND_H, t, phase=0.0, blink_amt=0.0)
-        right_land = draw_eye_frame(LAND_W, LAND_H, t, phase=0.0, blink_amt=0.0)
-        LEFT.display( to_panel_frame(left_land,  flip_180=FLIP_LEFT_180) )
-        RIGHT.display(to_panel_frame(right_land, flip_180=False))
+        pos = pupil_position(time.monotonic(), 0.0)
+        for dev, fn, args in panel_jobs(pos, pos, None):
+            dev.display_raw(fn(*args))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,37 @@
 # Turns BOTH screens RED if Klipper is in error/shutdown (from /printer/info or webhooks.state).
 
 import time, math, requests, traceback
+from requests.adapters import HTTPAdapter
+import json, threading, functools
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from typing import Optional, Dict, Any
-from PIL import Image, ImageDraw, ImageFont, Image as PILImage
-import os, configparser
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+import os, re
 import ST7735 as TFT
 import Adafruit_GPIO.SPI as SPI
 
+try:
+    from numba import njit   # optional: JIT the panel rotate + RGB565 pack
+except ImportError:
+    njit = None
+
+try:
+    from inotify_simple import INotify, flags   # optional: event-driven save_variables.cfg reload
+except ImportError:
+    INotify = None
+
+try:
+    from orjson import loads as json_loads   # optional: faster Moonraker JSON parsing
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import websocket   # optional: pip install websocket-client (push updates instead of HTTP polling)
+except ImportError:
+    websocket = None
+
 # ----------------- CONFIG -----------------
 MOONRAKER_URL = "http://127.0.0.1:7125"
 SCREENS = [
@@ -17,8 +41,14 @@ SCREENS = [
     {"name": "T1", "tool": "extruder1"},   # right
 ]
 POLL_HZ = 5
+IDLE_POLL_HZ = 1     # when nothing is printing, heating, spinning or messaging
 HTTP_TIMEOUT = 1.2
-BAUD = 16_000_000
+WS_RECONNECT_DELAY = 2.0  # seconds between websocket reconnect attempts
+HTTP_STATUS_MAX_AGE = 0.1  # HTTP fallback: reuse one objects query within a tick
+# Printer objects kept up to date over the Moonraker websocket
+SUBSCRIBE_OBJECTS = ["print_stats", "display_status", "extruder", "extruder1",
+                     "fan", "toolhead", "motion_report", "webhooks"]
+BAUD = 32_000_000  # drop to 16_000_000 if long wires show corrupt pixels
 ERROR_FLASH_PERIOD = 0.5  # seconds for on/off flash when Klipper is in error
 
 LAND_W, LAND_H = 160, 128          # draw in landscape
@@ -37,6 +67,8 @@ VEL_EMA_ALPHA = 0.35   # smoothing for e_vel (0=no smooth, 1=heavy smooth)
 EXTRUDER_PHASE = [0.0, 0.0]   # persistent phase per screen
 EXTRUDER_VEL_EMA = [0.0, 0.0] # smoothed e_vel per screen
 EXTRUDER_SPIN_DIR = -1.0
+# signed wheel radians per mm of filament: 2π / (mm/rev), folded once
+EXTRUDER_RAD_PER_MM = EXTRUDER_SPIN_DIR * (2.0 * math.pi) / max(1e-6, MM_PER_REV)
 _last_tick_time = None
 
 # M117 message tracking
@@ -44,7 +76,9 @@ _m117_message = None
 _m117_timestamp_mono = 0.0  # when we saw it, in time.monotonic() units
 _last_seen_gcode_time = None  # optional: track Moonraker's gcode time to avoid reprocessing history
 M117_CLEAR_TIMEOUT = 60.0
+GCODE_POLL_INTERVAL = 1.0  # seconds between gcode_store checks for M117 (also while idle)
 _cached_frames = [None, None]
+_sent_frames = [None, None]    # RGB565 bytes currently on each panel
 _last_frame_data = [None, None]
 _last_m117_message = None
 _last_m117_timestamp = 0.0
@@ -53,6 +87,7 @@ _last_m117_timestamp = 0.0
 # -------- THEME (Light Mode, BGR tuples) --------
 # -------- THEME (Neutral Gray Mode, BGR tuples) --------
 # -------- THEME (Dark-Grey Mode, BGR tuples) --------
+@functools.lru_cache(maxsize=64)
 def hex_to_bgr(hexstr: str) -> tuple[int,int,int]:
     hs = hexstr.lstrip("#")
     r = int(hs[0:2], 16); g = int(hs[2:4], 16); b = int(hs[4:6], 16)
@@ -86,8 +121,15 @@ BORDER_ACTIVE    = BRAND_YELLOW            # thick bright yellow (BGR)
 BORDER_IDLE      = hex_to_bgr("#51565E")   # thin neutral
 
 # ----------------- DISPLAY SETUP -----------------
-LEFT  = TFT.ST7735(25, rst=23, spi=SPI.SpiDev(0, 0, max_speed_hz=BAUD)); LEFT.begin()
-RIGHT = TFT.ST7735(24, rst=18, spi=SPI.SpiDev(0, 1, max_speed_hz=BAUD)); RIGHT.begin()
+# A full frame is 128*160*2 = 40960 bytes; with spidev's default 4096-byte
+# bufsiz it goes out as 10 transfers. Add "spidev.bufsiz=65536" to
+# /boot/cmdline.txt (or load spidev with bufsiz=65536) to send it in one.
+_bufsiz = TFT.spidev_bufsiz()
+if _bufsiz is not None and _bufsiz < PORTRAIT_W * PORTRAIT_H * 2:
+    print(f"WARNING: spidev bufsiz is {_bufsiz}, each frame needs several SPI transfers (set spidev.bufsiz=65536)")
+
+LEFT  = TFT.ST7735(25, rst=23, spi=SPI.SpiDev(0, 0, max_speed_hz=BAUD), spi_clock_hz=BAUD); LEFT.begin()
+RIGHT = TFT.ST7735(24, rst=18, spi=SPI.SpiDev(0, 1, max_speed_hz=BAUD), spi_clock_hz=BAUD); RIGHT.begin()
 
 def load_font():
     candidates = [
@@ -109,33 +151,63 @@ def load_font():
     return {"xl": f, "lg": f, "md": f, "sm": f, "xs": f}
 FONTS = load_font()
 
-_last_vars_mtime = None
+_last_vars_sig = None   # (st_mtime_ns, st_size, st_ino) of the last parse
 _last_active_tool = 0  # default to left
+# save_variables.cfg is tiny and rigidly "key = value"; one regex beats a full INI parse
+# (matched on raw bytes, no decode; ':' is also a valid INI delimiter)
+_ACTIVE_TOOL_RE = re.compile(rb'^\s*active_tool\s*[=:]\s*(\d+)', re.M)
+
+_vars_watch = None      # (path, INotify watching its directory), if inotify is available
+
+def _vars_maybe_changed(path: str) -> bool:
+    """
+    False only when an inotify watch says 'path' wasn't written, replaced or
+    removed since the last call; True (go and stat it) in every other case.
+    """
+    global _vars_watch
+    if INotify is None:
+        return True
+    if _vars_watch is None or _vars_watch[0] != path:
+        ino = None
+        try:
+            ino = INotify()
+            # watch the directory so rename-over saves are seen too
+            ino.add_watch(os.path.dirname(path) or ".",
+                          flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE)
+        except OSError:
+            if ino is not None:
+                ino.close()
+            return True
+        _vars_watch = (path, ino)
+        return True
+    name = os.path.basename(path)
+    return any(ev.name == name for ev in _vars_watch[1].read(timeout=0))
 
 def get_active_tool(path: str = VARS_PATH) -> int:
     """
     Reads [Variables] active_tool from Klipper's save_variables.cfg.
     Returns 0 for left (T0) or 1 for right (T1). Falls back to last known / 0.
     """
-    global _last_vars_mtime, _last_active_tool
+    global _last_vars_sig, _last_active_tool
 
     try:
+        if _last_vars_sig is not None and not _vars_maybe_changed(path):
+            return _last_active_tool
         st = os.stat(path)
-        mtime = st.st_mtime
-        # Only re-read if file changed
-        if _last_vars_mtime is not None and mtime == _last_vars_mtime:
+        # Only re-read if file changed; ns mtime + size + inode also catches
+        # same-second edits and Klipper's write-and-rename saves
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if sig == _last_vars_sig:
             return _last_active_tool
 
-        cfg = configparser.ConfigParser()
-        # Klipper writes standard INI; allow no-value quirks just in case
-        cfg.read(path)
-
-        val = cfg.getint("Variables", "active_tool", fallback=_last_active_tool)
+        with open(path, 'rb') as f:
+            m = _ACTIVE_TOOL_RE.search(f.read())
+        val = int(m.group(1)) if m else _last_active_tool
         if val not in (0, 1):
             val = _last_active_tool
 
         _last_active_tool = val
-        _last_vars_mtime = mtime
+        _last_vars_sig = sig
         return val
 
     except Exception:
@@ -161,22 +233,80 @@ class ExtruderData:
     m117_timestamp: float = 0.0 
 
 # ----------------- RENDER HELPERS -----------------
-def _soft_offset(img: Image) -> Image:
-    if OFF_X == 0 and OFF_Y == 0: return img
-    pad = Image.new("RGB", (PORTRAIT_W + OFF_X, PORTRAIT_H + OFF_Y), (0, 0, 0))
-    pad.paste(img, (OFF_X, OFF_Y))
-    return pad.crop((0, 0, PORTRAIT_W, PORTRAIT_H))
-
-def to_panel_frame(canvas_land: Image, flip_180: bool = False) -> Image:
-    frame = canvas_land.transpose(PILImage.ROTATE_270)
-    frame = _soft_offset(frame)
-    if flip_180:
-        frame = frame.transpose(PILImage.ROTATE_180)
-    return frame
+# Per-panel landscape canvases render_panel() redraws in place every frame
+_panel_canvas = [Image.new("RGB", (LAND_W, LAND_H), DARK_BG) for _ in range(2)]
+# ...and one long-lived Draw handle per canvas, keyed by id() (the canvases never go away)
+_panel_draw = {id(c): ImageDraw.Draw(c) for c in _panel_canvas}
+# Per-panel portrait buffers; the soft-offset margin is never written and stays black
+_panel_scratch = [np.zeros((PORTRAIT_H, PORTRAIT_W, 3), dtype=np.uint8) for _ in range(2)]
+
+_panel_packed = [np.empty(PORTRAIT_W * PORTRAIT_H * 2, dtype=np.uint8) for _ in range(2)]
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def panel_pack_numba(land, flip_180, out):
+        # ROTATE_270 + soft offset + optional 180° flip + RGB565 pack (high
+        # byte first) in one pass: walk the portrait panel, read landscape
+        for i in range(PORTRAIT_H):
+            for j in range(PORTRAIT_W):
+                si = PORTRAIT_H - 1 - i if flip_180 else i
+                sj = PORTRAIT_W - 1 - j if flip_180 else j
+                if si < OFF_Y or sj < OFF_X:
+                    c = 0                              # soft offset margin
+                else:
+                    y = LAND_H - 1 - (sj - OFF_X)
+                    x = si - OFF_Y
+                    c = ((land[y, x, 0] & 0xF8) << 8) | ((land[y, x, 1] & 0xFC) << 3) | (land[y, x, 2] >> 3)
+                k = 2 * (i * PORTRAIT_W + j)
+                out[k] = c >> 8
+                out[k + 1] = c & 0xFF
+else:
+    panel_pack_numba = None
+
+def to_panel_bytes(canvas_land: Image, flip_180: bool = False, scratch=None, packed=None) -> bytes:
+    """
+    Landscape canvas -> packed RGB565 bytes for a portrait panel.
+    With numba, rotate/offset/flip/pack is one JIT pass into 'packed'.
+    Otherwise ROTATE_270, the soft offset and the optional 180° flip are NumPy
+    views and one slice write into 'scratch', then the driver packs it.
+    """
+    land = np.asarray(canvas_land)
+    if panel_pack_numba is not None:
+        if packed is None:
+            packed = np.empty(PORTRAIT_W * PORTRAIT_H * 2, dtype=np.uint8)
+        panel_pack_numba(land, flip_180, packed)
+        return packed.tobytes()
+    if scratch is None:
+        scratch = np.zeros((PORTRAIT_H, PORTRAIT_W, 3), dtype=np.uint8)
+    r = np.rot90(land, k=-1)  # == ROTATE_270
+    scratch[OFF_Y:, OFF_X:] = r[:PORTRAIT_H - OFF_Y, :PORTRAIT_W - OFF_X]
+    frame = scratch[::-1, ::-1] if flip_180 else scratch
+    return TFT.array_to_data(frame)
 
 def label(draw, xy, text, font, fill=(255,255,255)):
     draw.text(xy, text, font=font, fill=fill)
 
+@functools.lru_cache(maxsize=1024)
+def text_width(text: str, font) -> float:
+    """Rendered width of 'text' (same as ImageDraw.textlength), cached: labels
+    like the tool name, badge and temps rarely change between frames."""
+    return font.getlength(text)
+
+@functools.lru_cache(maxsize=128)
+def _text_mask(text: str, font) -> tuple:
+    """Rasterize 'text' once into a tight 'L' coverage mask; returns (mask, x0, y0)."""
+    x0, y0, x1, y1 = font.getbbox(text)
+    mask = Image.new("L", (max(1, x1 - x0), max(1, y1 - y0)), 0)
+    ImageDraw.Draw(mask).text((-x0, -y0), text, font=font, fill=255)
+    return mask, x0, y0
+
+def blit_label(img: Image, xy, text, font, fill=(255,255,255)):
+    """Same pixels as label(), but pastes a cached glyph mask instead of re-laying out the text."""
+    if not text:
+        return
+    mask, x0, y0 = _text_mask(text, font)
+    img.paste(fill, (int(xy[0]) + x0, int(xy[1]) + y0), mask)
+
 def bar(draw: ImageDraw.ImageDraw, x, y, w, h, pct, col=(120,255,120), bg=(40,40,40)):
     pct = max(0, min(100, float(pct)))
     draw.rectangle((x, y, x+w, y+h), fill=bg, outline=(200,200,200))
@@ -191,7 +321,7 @@ def label_shadow(d, xy, text, font, fill=(255,255,255), shadow=(0,0,0)):
 
 def pill(d: ImageDraw.ImageDraw, x, y, text, font, pad_x=6, pad_y=2,
          fg=(0,0,0), bg=(200,200,200)):
-    tw = int(d.textlength(text, font=font))
+    tw = int(text_width(text, font))
     th = font.size
     w, h = tw + pad_x*2, th + pad_y*2
     r = h // 2
@@ -220,10 +350,12 @@ def draw_header_gradient(d, x, y, w, h, top, bottom, steps=6):
 
 def draw_badge(d, x, y, w, h, text, bg, fg, border):
     d.rectangle((x, y, x + w, y + h), fill=bg, outline=border)
-    tw = int(d.textlength(text, font=FONTS["xs"]))
+    tw = int(text_width(text, FONTS["xs"]))
     d.text((x + (w - tw)//2, y + 2), text, font=FONTS["xs"], fill=fg)
 
+@functools.lru_cache(maxsize=256)
 def temps_color(temp, target):
+    # Called with whole degrees (as displayed), so the cache stays small
     # color hint for the big temp text (BGR tuples)
     if target <= 0:
         return (255, 220, 200)  # warm white when idle (BGR)
@@ -255,6 +387,25 @@ def bar_rounded(d: ImageDraw.ImageDraw, x, y, w, h, pct,
         gloss_h = max(2, h//3)
         _rr(d, x+2, y+2, x+fillw-2, y+2+gloss_h, r=gloss_h//2, fill=(80,80,80), outline=None)
 
+# ---- Trig tables ----
+# The widgets only need a few pixels of angular resolution, so per-frame
+# angles come from a 256-step (cos, sin) table instead of math.cos/math.sin
+_SC_STEPS = 256
+_SC_SCALE = _SC_STEPS / (2 * math.pi)
+_SC = tuple((math.cos(2 * math.pi * i / _SC_STEPS), math.sin(2 * math.pi * i / _SC_STEPS))
+            for i in range(_SC_STEPS))
+
+def sc_index(angle_rad):
+    """Table step for angle_rad: angles with the same step draw identically."""
+    return round(angle_rad * _SC_SCALE) & (_SC_STEPS - 1)
+
+def cos_sin(angle_rad):
+    """(cos, sin) of angle_rad, to the nearest 1/256 turn."""
+    return _SC[sc_index(angle_rad)]
+
+# XY orbit ticks (NESW + diagonals) never move
+_ORBIT_TICKS = tuple((math.cos(math.radians(a)), math.sin(math.radians(a))) for a in range(0, 360, 45))
+
 # ---- Fan drawing / animation ----
 def fan_blade_polygon(cx, cy, r, angle_rad, thickness=0.42):
     """
@@ -266,7 +417,7 @@ def fan_blade_polygon(cx, cy, r, angle_rad, thickness=0.42):
     base1 = (r * (0.15),  r * thickness)
     base2 = (r * (0.15), -r * thickness)
 
-    ca, sa = math.cos(angle_rad), math.sin(angle_rad)
+    ca, sa = cos_sin(angle_rad)
     def rot(p):
         x, y = p
         return (cx + ca*x - sa*y, cy + sa*x + ca*y)
@@ -276,24 +427,32 @@ def draw_fan_icon(d: ImageDraw.ImageDraw, x, y, size, angle_rad, on, theme_fg=(2
     """
     Draw a 3-blade fan centered at (x,y) with given 'size' (diameter-ish).
     angle_rad is the current rotation angle. 'on' toggles color/accent.
+    The shapes come pre-rasterized from _fan_masks(); only colors are applied here.
     """
     r = size // 2
-    cx, cy = x, y
+    ring, blades, hub = _fan_masks(size, sc_index(angle_rad))
+    xy = (int(x) - r, int(y) - r)
     # outer ring
-    ring_col = (90, 95, 105)
-    d.ellipse((cx - r, cy - r, cx + r, cy + r), outline=ring_col)
-
+    d.bitmap(xy, ring, fill=(90, 95, 105))
     # blades
-    blade_fill = accent if on else theme_fg
-    for i in range(3):
-        ang = angle_rad + i * (2*math.pi/3)
-        poly = fan_blade_polygon(cx, cy, int(r*0.88), ang, thickness=0.38)
-        d.polygon(poly, fill=blade_fill)
-
+    d.bitmap(xy, blades, fill=accent if on else theme_fg)
     # hub
+    d.bitmap(xy, hub, fill=(40, 45, 50) if on else (70, 75, 85))
+
+@functools.lru_cache(maxsize=2 * _SC_STEPS)
+def _fan_masks(size, step):
+    # (ring, blades, hub) "L" masks of a fan centered in a (2r+1)² tile, with
+    # the first blade at table step 'step' (the others 1/3 turn apart)
+    r = size // 2
+    masks = [Image.new("L", (2*r + 1, 2*r + 1), 0) for _ in range(3)]
+    ring, blades, hub = (ImageDraw.Draw(m) for m in masks)
+    ring.ellipse((0, 0, 2*r, 2*r), outline=255)
+    for i in range(3):
+        ang = step / _SC_SCALE + i * (2*math.pi/3)
+        blades.polygon(fan_blade_polygon(r, r, int(r*0.88), ang, thickness=0.38), fill=255)
     hub_r = max(2, int(r*0.22))
-    hub_col = (40, 45, 50) if on else (70, 75, 85)
-    d.ellipse((cx - hub_r, cy - hub_r, cx + hub_r, cy + hub_r), fill=hub_col, outline=None)
+    hub.ellipse((r - hub_r, r - hub_r, r + hub_r, r + hub_r), fill=255)
+    return tuple(masks)
 
 def draw_xy_orbit(d: ImageDraw.ImageDraw, x, y, size, pos_x, pos_y,
                   bed_w=BED_W, bed_h=BED_H,
@@ -312,12 +471,11 @@ def draw_xy_orbit(d: ImageDraw.ImageDraw, x, y, size, pos_x, pos_y,
     d.ellipse((cx - inner, cy - inner, cx + inner, cy + inner), outline=track)
 
     # ticks (NESW + diagonals)
-    for ang in range(0, 360, 45):
-        a = math.radians(ang)
-        r0 = int(r * 0.88)
-        r1 = r
-        x0 = cx + int(r0 * math.cos(a)); y0 = cy + int(r0 * math.sin(a))
-        x1 = cx + int(r1 * math.cos(a)); y1 = cy + int(r1 * math.sin(a))
+    r0 = int(r * 0.88)
+    r1 = r
+    for ca, sa in _ORBIT_TICKS:
+        x0 = cx + int(r0 * ca); y0 = cy + int(r0 * sa)
+        x1 = cx + int(r1 * ca); y1 = cy + int(r1 * sa)
         d.line((x0, y0, x1, y1), fill=ticks)
 
     # normalize XY to [0,1] around center, then project to polar
@@ -337,21 +495,30 @@ def draw_xy_orbit(d: ImageDraw.ImageDraw, x, y, size, pos_x, pos_y,
     d.ellipse((px - 1, py - 1, px + 1, py + 1), fill=ticks)
     d.ellipse((px - 2, py - 2, px + 2, py + 2), fill=dot)
 
+@functools.lru_cache(maxsize=4)
+def _orbit_ring_mask(r):
+    # outer + inner track circles of an extruder orbit, in a (2r+1)² tile
+    m = Image.new("L", (2*r + 1, 2*r + 1), 0)
+    d = ImageDraw.Draw(m)
+    d.ellipse((0, 0, 2*r, 2*r), outline=255)
+    ir = int(r * 0.72)
+    d.ellipse((r - ir, r - ir, r + ir, r + ir), outline=255)
+    return m
+
 def draw_extruder_orbit(d: ImageDraw.ImageDraw, x, y, size, phase, e_vel,
                         track=(58,62,70), dot=(255,215,0), trail=(100,105,115)):
     r  = size // 2
     cx = x + r
     cy = y + r
 
-    # ring
-    d.ellipse((cx - r, cy - r, cx + r, cy + r), outline=track)
-    ir = int(r * 0.72)
-    d.ellipse((cx - ir, cy - ir, cx + ir, cy + ir), outline=track)
+    # ring (static, stamped from a cached mask)
+    d.bitmap((cx - r, cy - r), _orbit_ring_mask(r), fill=track)
 
     # Dot on the outer track from phase
     pr = int((r - 3) * 0.88)
-    px = cx + int(pr * math.cos(phase))
-    py = cy + int(pr * math.sin(phase))
+    ca, sa = cos_sin(phase)
+    px = cx + int(pr * ca)
+    py = cy + int(pr * sa)
 
     # trail (length scales with |e_vel|)
     sweep = max(0.0, min(1.0, abs(e_vel))) * (math.pi / 4)  # up to 45°
@@ -360,9 +527,9 @@ def draw_extruder_orbit(d: ImageDraw.ImageDraw, x, y, size, phase, e_vel,
         steps = 7
         for i in range(steps):
             t = i / max(1, steps - 1)
-            aa = a0 + t * math.copysign(sweep, e_vel)
-            tx = cx + int(pr * math.cos(aa))
-            ty = cy + int(pr * math.sin(aa))
+            ca, sa = cos_sin(a0 + t * math.copysign(sweep, e_vel))
+            tx = cx + int(pr * ca)
+            ty = cy + int(pr * sa)
             d.ellipse((tx - 1, ty - 1, tx + 1, ty + 1), fill=trail)
 
     # Dot
@@ -372,7 +539,9 @@ def _mix(c1, c2, t):
     # linear blend between two BGR tuples
     return tuple(int(c1[i] * (1 - t) + c2[i] * t) for i in range(3))
 
+@functools.lru_cache(maxsize=101)
 def _progress_fill_color(pct):
+    # Called with whole percents (as displayed): at most 101 distinct colors
     # low→mid→high gradient
     t = max(0.0, min(100.0, float(pct))) / 100.0
     if t < 0.5:
@@ -386,7 +555,30 @@ def _rr(d, x0, y0, x1, y1, r, fill=None, outline=None):
     """
     Back-compat rounded rectangle for old Pillow.
     Draws fill first, then a 1px outline if provided.
+    The shape only depends on its size and radius, so it is rasterized once
+    per (w, h, r) into masks and stamped with d.bitmap().
     """
+    if x1 < x0 or y1 < y0:
+        _rr_draw(d, x0, y0, x1, y1, r, fill=fill, outline=outline)
+        return
+    fill_mask, outline_mask = _rr_masks(x1 - x0, y1 - y0, r)
+    if fill is not None:
+        d.bitmap((x0, y0), fill_mask, fill=fill)
+    if outline is not None:
+        d.bitmap((x0, y0), outline_mask, fill=outline)
+
+@functools.lru_cache(maxsize=256)
+def _rr_masks(w, h, r):
+    # (fill, outline) "L" masks of a _rr() shape whose box is (0, 0, w, h)
+    masks = []
+    for kind in ("fill", "outline"):
+        m = Image.new("L", (w + 1, h + 1), 0)
+        _rr_draw(ImageDraw.Draw(m), 0, 0, w, h, r, **{kind: 255})
+        masks.append(m)
+    return tuple(masks)
+
+def _rr_draw(d, x0, y0, x1, y1, r, fill=None, outline=None):
+    # Draws the rounded rectangle with rectangles + pieslices/arcs
     w = max(0, x1 - x0); h = max(0, y1 - y0)
     r = max(0, min(r, w//2, h//2))
 
@@ -419,14 +611,17 @@ def _rr(d, x0, y0, x1, y1, r, fill=None, outline=None):
 
 def draw_progress_bar_modern(d: ImageDraw.ImageDraw, x, y, w, h, pct):
     pct = max(0.0, min(100.0, float(pct)))
+    _draw_progress_bar(d, x, y, w, h, int(w * pct / 100.0), int(pct))
+
+def _draw_progress_bar(d, x, y, w, h, fw, pct_i):
+    # fw: filled width in px, pct_i: whole percent (fill color and label)
 
     # Track
     _rr(d, x, y, x + w, y + h, r=h//2, fill=BAR_BG, outline=BAR_OUTLINE)
 
     # Fill
-    fw = int(w * pct / 100.0)
     if fw > 0:
-        fill_col = _progress_fill_color(pct)
+        fill_col = _progress_fill_color(pct_i)
         _rr(d, x, y, x + fw, y + h, r=h//2, fill=fill_col, outline=None)
 
         # glossy top band (simple rectangular gloss inside the filled area)
@@ -438,11 +633,27 @@ def draw_progress_bar_modern(d: ImageDraw.ImageDraw, x, y, w, h, pct):
     d.line((x+2, y+1, x+w-2, y+1), fill=(90,90,90))
 
     # centered % text
-    label = f"{int(pct)}%"
-    tw = int(d.textlength(label, font=FONTS["xs"]))
+    label = f"{pct_i}%"
+    tw = int(text_width(label, FONTS["xs"]))
     d.text((x + (w - tw)//2, y + (h - FONTS["xs"].size)//2 - 1),
            label, font=FONTS["xs"], fill=TEXT_SECONDARY)
 
+def paste_progress_bar(img: Image, x, y, w, h, pct):
+    """
+    Same pixels as draw_progress_bar_modern(), pasted from a sprite cached per
+    (filled width, whole percent) instead of redrawn every frame.
+    """
+    pct = max(0.0, min(100.0, float(pct)))
+    sprite = _progress_bar_sprite(w, h, int(w * pct / 100.0), int(pct))
+    img.paste(sprite, (x, y), sprite)
+
+@functools.lru_cache(maxsize=128)
+def _progress_bar_sprite(w, h, fw, pct_i):
+    # RGBA tile, transparent outside the rounded track
+    sprite = Image.new("RGBA", (w + 1, h + 1), (0, 0, 0, 0))
+    _draw_progress_bar(ImageDraw.Draw(sprite), 0, 0, w, h, fw, pct_i)
+    return sprite
+
 def draw_modern_m117_message(d: ImageDraw.ImageDraw, message: str, timestamp: float):
     """Draw a clean, static M117 message display"""
     
@@ -470,7 +681,7 @@ def draw_modern_m117_message(d: ImageDraw.ImageDraw, message: str, timestamp: fl
     
     for word in words:
         test_line = f"{current_line} {word}".strip()
-        if d.textlength(test_line, font=FONTS["sm"]) <= max_width:
+        if text_width(test_line, FONTS["sm"]) <= max_width:
             current_line = test_line
         else:
             if current_line:
@@ -498,33 +709,39 @@ def draw_modern_m117_message(d: ImageDraw.ImageDraw, message: str, timestamp: fl
 def ellipsize_middle(d: ImageDraw.ImageDraw, text: str, font, max_w: int) -> str:
     if not text:
         return ""
-    if d.textlength(text, font=font) <= max_w:
+    # The cap text rarely changes between frames, so the fitted result is cached
+    return _ellipsize_middle(text, font, max_w)
+
+@functools.lru_cache(maxsize=64)
+def _ellipsize_middle(text: str, font, max_w: int) -> str:
+    width = font.getlength
+    if width(text) <= max_w:
         return text
     # Try to preserve extension
     root, ext = os.path.splitext(text)
-    left, right = 0, 0
     ellipsis = "…"
     # If removing entire root still too long, just hard trim
-    if d.textlength(ellipsis + ext, font=font) > max_w:
+    if width(ellipsis + ext) > max_w:
         # fallback: trim whole thing
         s = text
-        while s and d.textlength(s + ellipsis, font=font) > max_w:
+        while s and width(s + ellipsis) > max_w:
             s = s[:-1]
         return s + ellipsis
-    # Middle-chop the root
-    while left + right < len(root):
-        candidate = root[:max(1, left)] + ellipsis + root[-max(1, right):] + ext
-        if d.textlength(candidate, font=font) <= max_w:
-            left += 1
-            right += 1
+    # Middle-chop the root: binary search for the most characters kept on
+    # each side (width grows with k, so ~log2(n) measurements)
+    def candidate(k):
+        return root[:k] + ellipsis + root[-k:] + ext
+    lo, hi = 1, max(1, (len(root) - 1) // 2)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if width(candidate(mid)) <= max_w:
+            lo = mid
         else:
-            # back off one step
-            left = max(1, left - 1)
-            right = max(1, right - 1)
-            break
-    candidate = root[:max(1, left)] + ellipsis + root[-max(1, right):] + ext
+            hi = mid - 1
+    left = right = lo
+    cand = candidate(lo)
     # final safety pass
-    while candidate and d.textlength(candidate, font=font) > max_w:
+    while cand and width(cand) > max_w:
         # shave a bit more from the middle
         if left > right and left > 1:
             left -= 1
@@ -532,30 +749,70 @@ def ellipsize_middle(d: ImageDraw.ImageDraw, text: str, font, max_w: int) -> str
             right -= 1
         else:
             break
-        candidate = root[:max(1, left)] + ellipsis + root[-max(1, right):] + ext
-    return candidate
+        cand = root[:left] + ellipsis + root[-right:] + ext
+    return cand
+
+# Header layout shared by _panel_chrome() and render_panel()
+PANEL_HEADER_H = 28
+PANEL_TITLE_X, PANEL_TITLE_Y = 6, 6
+PANEL_BADGE_W, PANEL_BADGE_H = 74, 22
+PANEL_BADGE_X, PANEL_BADGE_Y = LAND_W - PANEL_BADGE_W - 6, 4
 
-def render_panel(name: str, data: ExtruderData, active: bool = False, extruder_phase: float = 0.0) -> Image:
+@functools.lru_cache(maxsize=8)
+def _panel_chrome(name: str, active: bool) -> Image:
+    """
+    Everything in a panel that only depends on the tool name and active flag:
+    header gradient, title, badge, divider, corner notches and outer border.
+    Built once per (name, active) and copied by render_panel().
+    """
     img = Image.new("RGB", (LAND_W, LAND_H), DARK_BG)
     d = ImageDraw.Draw(img)
 
-        # --- Taller header band with subtle gradient ---
-    header_h = 28
+    # --- Taller header band with subtle gradient ---
+    header_h = PANEL_HEADER_H
     grad_top    = hex_to_bgr("#232831")
     grad_bottom = hex_to_bgr("#1A1F26")
     draw_header_gradient(d, 0, 0, LAND_W, header_h, grad_top, grad_bottom, steps=5)
 
     # Title (tool name)
-    title_x, title_y = 6, 6
-    d.text((title_x, title_y), name, font=FONTS["lg"], fill=TEXT_PRIMARY)
+    blit_label(img, (PANEL_TITLE_X, PANEL_TITLE_Y), name, FONTS["lg"], fill=TEXT_PRIMARY)
 
-    # Badge: "ACTIVE" / "STANDBY" (draw this first so we know where the fan can go)
+    # Badge: "ACTIVE" / "STANDBY"
     title_state = "ACTIVE" if active else "STANDBY"
-    badge_w, badge_h = 74, 22
-    badge_x, badge_y = LAND_W - badge_w - 6, 4
     badge_bg = BADGE_ACTIVE_BG if active else BADGE_IDLE_BG
     badge_border = BRAND_YELLOW if active else DIVIDER_COLOR
-    draw_badge(d, badge_x, badge_y, badge_w, badge_h, title_state, badge_bg, BADGE_TEXT, badge_border)
+    draw_badge(d, PANEL_BADGE_X, PANEL_BADGE_Y, PANEL_BADGE_W, PANEL_BADGE_H,
+               title_state, badge_bg, BADGE_TEXT, badge_border)
+
+    # Divider under header
+    draw_h_rule(d, 6, LAND_W - 6, header_h, DIVIDER_COLOR)
+
+    # Corner notches (subtle accent)
+    draw_corner_notches(d, LAND_W, LAND_H, DIVIDER_COLOR, size=6)
+
+    # --- Outer border (BGR) — thicker when active ---
+    border_col = BORDER_ACTIVE if active else BORDER_IDLE
+    thickness = 4 if active else 1
+    for i in range(thickness):
+        d.rectangle((i, i, LAND_W - 1 - i, LAND_H - 1 - i), outline=border_col)
+    return img
+
+def render_panel(name: str, data: ExtruderData, active: bool = False, extruder_phase: float = 0.0,
+                 out: Optional[Image.Image] = None) -> Image:
+    # Static chrome (header, title, badge, divider, notches, border) is cached;
+    # only the live widgets are drawn per frame. With 'out' the frame is drawn
+    # into that (reused) canvas instead of a fresh copy.
+    chrome = _panel_chrome(name, active)
+    if out is None:
+        img = chrome.copy()
+    else:
+        img = out
+        img.paste(chrome, (0, 0))
+    d = _panel_draw.get(id(img)) or ImageDraw.Draw(img)
+
+    header_h = PANEL_HEADER_H
+    title_x = PANEL_TITLE_X
+    badge_x = PANEL_BADGE_X
 
     # Fan icon in header, on the right (just left of the badge)
     try:
@@ -566,7 +823,7 @@ def render_panel(name: str, data: ExtruderData, active: bool = False, extruder_p
     fan_size = 18
 
     # measure text width
-    title_width = d.textlength(name, font=FONTS["lg"])
+    title_width = text_width(name, FONTS["lg"])
     title_right = title_x + title_width
 
     # center fan horizontally between tool name and badge
@@ -578,14 +835,12 @@ def render_panel(name: str, data: ExtruderData, active: bool = False, extruder_p
     draw_fan_icon(d, fan_cx, fan_cy, fan_size, FAN_PHASE, fan_on,
                   theme_fg=TEXT_SECONDARY, accent=BRAND_YELLOW)
 
-    # Divider under header
-    draw_h_rule(d, 6, LAND_W - 6, header_h, DIVIDER_COLOR)
-
     # --- Big temps (always) ---
-    temp_text = f"{int(data.temp)}/{int(data.target)}°C"
-    temp_col = temps_color(data.temp, data.target)  # subtle state color
-    tw = int(d.textlength(temp_text, font=FONTS["xl"]))
-    d.text(((LAND_W - tw)//2, 48), temp_text, font=FONTS["xl"], fill=temp_col)
+    t_i, tgt_i = int(data.temp), int(data.target)
+    temp_text = f"{t_i}/{tgt_i}°C"
+    temp_col = temps_color(t_i, tgt_i)  # subtle state color
+    tw = int(text_width(temp_text, FONTS["xl"]))
+    blit_label(img, ((LAND_W - tw)//2, 48), temp_text, FONTS["xl"], fill=temp_col)
 
     if active:
         orbit_size   = 36
@@ -597,18 +852,9 @@ def render_panel(name: str, data: ExtruderData, active: bool = False, extruder_p
         xy_font = FONTS["sm"]
         txt_x = orbit_x + orbit_size + 8
         txt_y = orbit_y + 2
-        d.text((txt_x, txt_y),        f"X {data.x:.1f}", font=xy_font, fill=TEXT_SECONDARY)
-        d.text((txt_x, txt_y + xy_font.size + 2), f"Y {data.y:.1f}", font=xy_font, fill=TEXT_SECONDARY)
-
-    # Corner notches (subtle accent)
-    draw_corner_notches(d, LAND_W, LAND_H, DIVIDER_COLOR, size=6)
+        blit_label(img, (txt_x, txt_y),        f"X {data.x:.1f}", xy_font, fill=TEXT_SECONDARY)
+        blit_label(img, (txt_x, txt_y + xy_font.size + 2), f"Y {data.y:.1f}", xy_font, fill=TEXT_SECONDARY)
 
-    # --- Outer border (BGR) — thicker when active ---
-    border_col = BORDER_ACTIVE if active else BORDER_IDLE
-    thickness = 4 if active else 1
-    for i in range(thickness):
-        d.rectangle((i, i, LAND_W - 1 - i, LAND_H - 1 - i), outline=border_col)
-    
     if not active:
         bar_h = 12
         margin = 8
@@ -621,50 +867,58 @@ def render_panel(name: str, data: ExtruderData, active: bool = False, extruder_p
         max_w = bar_w
         show_cap_text = data.m117_message if data.m117_message is not None else ""
 
-    # Draw the (possibly empty) M117 text; no filename fallback — cap reserved
-    cap_text = ellipsize_middle(d, show_cap_text, cap_font, max_w)
-    tw = int(d.textlength(cap_text, font=cap_font))
-    cap_x = bar_x + (bar_w - tw)//2
-    cap_h = cap_font.size + 4
-    cap_y = bar_y - (cap_font.size + 3)  # a little gap above the bar
+        # Draw the (possibly empty) M117 text; no filename fallback — cap reserved
+        cap_text = ellipsize_middle(d, show_cap_text, cap_font, max_w)
+        tw = int(text_width(cap_text, cap_font))
+        cap_x = bar_x + (bar_w - tw)//2
+        cap_h = cap_font.size + 4
+        cap_y = bar_y - (cap_font.size + 3)  # a little gap above the bar
 
-    # Clear the cap area first so an empty M117 doesn't leave previous pixels.
-    cap_x0 = bar_x
-    cap_y0 = bar_y - cap_h - 4
-    cap_x1 = bar_x + bar_w
-    cap_y1 = bar_y - 2
-    _rr(d, cap_x0, cap_y0, cap_x1, cap_y1, r=4, fill=DARK_SURFACE, outline=None)
+        # Clear the cap area first so an empty M117 doesn't leave previous pixels.
+        cap_x0 = bar_x
+        cap_y0 = bar_y - cap_h - 4
+        cap_x1 = bar_x + bar_w
+        cap_y1 = bar_y - 2
+        _rr(d, cap_x0, cap_y0, cap_x1, cap_y1, r=4, fill=DARK_SURFACE, outline=None)
 
-    d.text((cap_x, cap_y), cap_text, font=cap_font, fill=TEXT_SECONDARY)
+        blit_label(img, (cap_x, cap_y), cap_text, cap_font, fill=TEXT_SECONDARY)
 
-    draw_progress_bar_modern(d, bar_x, bar_y, bar_w, bar_h, data.progress)
+        paste_progress_bar(img, bar_x, bar_y, bar_w, bar_h, data.progress)
 
     return img
 
 # --------------- ERROR SCREENS ----------------
-def render_error_screen(title: str, msg: str, bg_color: tuple[int,int,int] = (0, 0, 180)) -> Image:
+@functools.lru_cache(maxsize=32)
+def wrap_words(text: str, font, max_w: int) -> tuple:
     """
-    Render an error screen. bg_color lets the caller choose the background so
-    the caller can implement flashing by alternating the color.
+    Greedy word-wrap of 'text' into lines no wider than max_w (a single word
+    wider than that gets a line of its own). Cached, so the bright and dim
+    flash frames of an error, and repeated errors, wrap the message once.
     """
-    img = Image.new("RGB", (LAND_W, LAND_H), bg_color)
-    d = ImageDraw.Draw(img)
-    label(d, (6, 4), title, FONTS["lg"], fill=(255,255,255))
-
-    # word-wrap
-    words = (msg or "").replace("\n", " ").split()
     lines, line = [], ""
-    for w in words:
+    for w in text.replace("\n", " ").split():
         test = f"{line} {w}".strip()
-        if d.textlength(test, font=FONTS["xs"]) > LAND_W - 12:
+        if text_width(test, font) > max_w:
             lines.append(line); line = w
         else:
             line = test
     if line: lines.append(line)
+    return tuple(lines)
+
+def render_error_screen(title: str, msg: str, bg_color: tuple[int,int,int] = (0, 0, 180)) -> Image:
+    """
+    Render an error screen. bg_color lets the caller choose the background so
+    the caller can implement flashing by alternating the color.
+    """
+    img = Image.new("RGB", (LAND_W, LAND_H), bg_color)
+    d = ImageDraw.Draw(img)
+    blit_label(img, (6, 4), title, FONTS["lg"], fill=(255,255,255))
+
+    lines = wrap_words(msg or "", FONTS["xs"], LAND_W - 12)
 
     y = 26
     for ln in lines[:7]:
-        label(d, (6, y), ln, FONTS["xs"], fill=(255,255,255))
+        blit_label(img, (6, y), ln, FONTS["xs"], fill=(255,255,255))
         y += 12
 
     # border color: slightly lighter than background for visibility
@@ -675,25 +929,147 @@ def render_error_screen(title: str, msg: str, bg_color: tuple[int,int,int] = (0,
     d.rectangle((0, 0, LAND_W-1, LAND_H-1), outline=border_col)
     return img
 
+@functools.lru_cache(maxsize=8)
+def _cached_error_frames(title: str, msg: str, bg_color: tuple[int,int,int]) -> tuple:
+    # (left, right) packed panel bytes; both flash phases of an error stay cached
+    img = render_error_screen(title, msg, bg_color=bg_color)
+    return (to_panel_bytes(img, flip_180=FLIP_LEFT_180, scratch=_panel_scratch[0], packed=_panel_packed[0]),
+            to_panel_bytes(img, flip_180=False, scratch=_panel_scratch[1], packed=_panel_packed[1]))
+
 def display_error_all(title: str, msg: str, bg_color: tuple[int,int,int] = (0, 0, 180)):
     """Display the same error on both panels. bg_color allows flashing by toggling.
     """
-    frameL = to_panel_frame(render_error_screen(title, msg, bg_color=bg_color), flip_180=FLIP_LEFT_180)
-    frameR = to_panel_frame(render_error_screen(title, msg, bg_color=bg_color), flip_180=False)
-    LEFT.display(frameL)
-    RIGHT.display(frameR)
+    # The dashboard frames are gone from the panels; force a redraw afterwards
+    _cached_frames[0] = _cached_frames[1] = None
+    # Render and pack once per (title, msg, bg) and reuse across repeated/flashing errors.
+    # A failure left over from an earlier push is dropped: this runs from
+    # main()'s error handler, and the failed panel gets a full write anyway.
+    push_frames(list(_cached_error_frames(title, msg, tuple(bg_color))), raise_errors=False)
+
+def push_frame(panel_index: int, data: bytes):
+    """Send a packed frame to a panel, writing only the rows that changed."""
+    if data == _sent_frames[panel_index]:
+        return  # identical frame: one memcmp, no row diff or SPI at all
+    try:
+        (LEFT, RIGHT)[panel_index].display_raw_diff(data, _sent_frames[panel_index])
+    except Exception:
+        # panel contents are unknown now: next push rewrites the whole frame
+        _sent_frames[panel_index] = None
+        raise
+    _sent_frames[panel_index] = data
+
+# One worker per panel: the SPI writes release the GIL, so one panel's
+# transfer (and its DC/CS handling) overlaps the other's
+_push_pool = ThreadPoolExecutor(max_workers=2)
+# Pushes still in flight from the previous call
+_push_pending = []
+
+def push_frames(frames: list, raise_errors: bool = True):
+    """
+    Push frames[i] to panel i concurrently; None leaves that panel as is.
+    Returns without waiting, so the transfer overlaps the next tick's fetch
+    and render. The next call first waits for all of the previous pushes, so
+    frames reach each panel in order, and then (with raise_errors) re-raises
+    the first error among them instead of pushing.
+    """
+    global _push_pending
+    pending, _push_pending = _push_pending, []
+    wait(pending)
+    if raise_errors:
+        for fut in pending:
+            if fut.exception() is not None:
+                raise fut.exception()
+    _push_pending = [_push_pool.submit(push_frame, i, f) for i, f in enumerate(frames) if f is not None]
 
 # ----------------- MOONRAKER -----------------
 class MoonrakerClient:
     def __init__(self, base_url: str, timeout: float = 1.2):
         self.base = base_url.rstrip("/")
         self.s = requests.Session()
+        # Everything goes to one host: a single small keep-alive pool
+        self.s.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        # Moonraker is local: skip gzip, its decode costs more than the bytes saved
+        self.s.headers["Accept-Encoding"] = "identity"
         self.timeout = timeout
+        # Status pushed over the websocket (None until the first subscribe reply)
+        self.latest_status: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self._ws_thread = None
+        # (monotonic time, status) of the last HTTP objects query
+        self._http_status = None
 
     def _get(self, path: str) -> dict:
         r = self.s.get(f"{self.base}{path}", timeout=self.timeout)
         r.raise_for_status()
-        return r.json()
+        return json_loads(r.content)
+
+    # ---- websocket subscription ----
+    def subscribe(self, objects: list) -> bool:
+        """
+        Start a background thread that subscribes to 'objects' over Moonraker's
+        websocket and merges notify_status_update diffs into latest_status.
+        Returns False (and the client keeps polling HTTP) if websocket-client
+        isn't installed.
+        """
+        if websocket is None:
+            return False
+        if self._ws_thread is None:
+            self._ws_thread = threading.Thread(target=self._ws_pump, args=(list(objects),), daemon=True)
+            self._ws_thread.start()
+        return True
+
+    def _set_status(self, status: Optional[dict]):
+        with self._lock:
+            self.latest_status = status
+
+    def _ws_pump(self, objects: list):
+        url = "ws" + self.base[len("http"):] + "/websocket"
+        req = {"jsonrpc": "2.0", "method": "printer.objects.subscribe",
+               "params": {"objects": {o: None for o in objects}}}
+        req_id = 0
+        while True:
+            try:
+                ws = websocket.create_connection(url, timeout=10)
+                try:
+                    req_id += 1
+                    ws.send(json.dumps(dict(req, id=req_id)))
+                    while True:
+                        msg = json_loads(ws.recv())
+                        method = msg.get("method")
+                        if msg.get("id") == req_id and "result" in msg:
+                            # full snapshot of the subscribed objects
+                            self._set_status(msg["result"].get("status") or {})
+                        elif method == "notify_status_update":
+                            diff = msg["params"][0]
+                            with self._lock:
+                                if self.latest_status is not None:
+                                    for obj, fields in diff.items():
+                                        self.latest_status.setdefault(obj, {}).update(fields)
+                        elif method == "notify_klippy_ready":
+                            # subscriptions don't survive a Klippy restart
+                            req_id += 1
+                            ws.send(json.dumps(dict(req, id=req_id)))
+                        elif method == "notify_klippy_shutdown":
+                            # flip state right away so klippy_state() needs no HTTP
+                            with self._lock:
+                                if self.latest_status is not None:
+                                    self.latest_status.setdefault("webhooks", {})["state"] = "shutdown"
+                        elif method == "notify_klippy_disconnected":
+                            # stale until Klippy is back; fall back to HTTP meanwhile
+                            self._set_status(None)
+                finally:
+                    ws.close()
+            except Exception:
+                pass
+            self._set_status(None)
+            time.sleep(WS_RECONNECT_DELAY)
+
+    def _status_snapshot(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        # copy so the pump thread can keep merging while we read
+        with self._lock:
+            if self.latest_status is None:
+                return None
+            return {k: dict(v) for k, v in self.latest_status.items()}
 
     def klippy_state(self) -> dict:
         """
@@ -701,6 +1077,20 @@ class MoonrakerClient:
           state: 'ready' | 'printing' | 'shutdown' | 'error' | ...
           message: optional state_message from webhooks if present
         """
+        status = self._status_snapshot()
+        if status is not None and "webhooks" in status:
+            w = status["webhooks"]
+            return {"state": (w.get("state") or "").lower(), "message": w.get("state_message") or ""}
+
+        # Without the websocket, one objects query (incl. webhooks) per tick
+        # serves both this and the following query_all()
+        try:
+            w = self._http_query_all().get("webhooks") or {}
+            if w.get("state"):
+                return {"state": w["state"].lower(), "message": w.get("state_message") or ""}
+        except Exception:
+            pass
+
         # /printer/info is authoritative for Klippy state
         info = self._get("/printer/info")
         state = (info.get("result", {}).get("state") or "").lower()
@@ -728,79 +1118,105 @@ class MoonrakerClient:
         except Exception:
             return []
     
-    def query_tool(self, tool: str) -> ExtruderData:
-        # ask for print_stats/display_status, both extruders, fan, and motion_report
-        q = "print_stats&display_status&extruder&extruder1&fan&toolhead&motion_report"
-        js = self._get(f"/printer/objects/query?{q}")
-        status: Dict[str, Any] = js["result"]["status"]
-
-        ext = status.get(tool) or status.get("extruder", {})
-        temp   = float(ext.get("temperature", 0.0))
-        target = float(ext.get("target", 0.0))
-
-        ps = status.get("print_stats", {})
-        state = (ps.get("state") or "unknown").upper()
+    def query_all(self) -> Dict[str, Any]:
+        """
+        Raw status dict for all subscribed/queried objects (both extruders in
+        one go): the websocket snapshot if available, else one HTTP query.
+        """
+        status = self._status_snapshot()
+        if status is None:
+            # reuse the query klippy_state() just made this tick, if fresh
+            fetched = self._http_status
+            if fetched is not None and time.monotonic() - fetched[0] < HTTP_STATUS_MAX_AGE:
+                status = fetched[1]
+            else:
+                status = self._http_query_all()
+        return status
 
-        raw_name = ps.get("filename") or ""
-        try:
-            fname = os.path.basename(raw_name) if raw_name else ""
-        except Exception:
-            fname = raw_name or ""
+    def _http_query_all(self) -> Dict[str, Any]:
+        # print_stats/display_status, both extruders, fan, toolhead, motion_report and webhooks
+        q = "&".join(SUBSCRIBE_OBJECTS)
+        js = self._get(f"/printer/objects/query?{q}")
+        status = js["result"]["status"]
+        self._http_status = (time.monotonic(), status)
+        return status
 
+    def query_tool(self, tool: str) -> ExtruderData:
+        return extract_extruder(self.query_all(), tool)
 
-        prog = ps.get("progress")
-        if prog is None:
-            prog = status.get("display_status", {}).get("progress", 0.0)
-        progress_pct = float(prog) * 100.0 if prog is not None else 0.0
+def extract_extruder(status: Dict[str, Any], tool: str) -> ExtruderData:
+    """Build the ExtruderData for 'tool' from a Moonraker status dict."""
+    ext = status.get(tool) or status.get("extruder", {})
+    temp   = float(ext.get("temperature", 0.0))
+    target = float(ext.get("target", 0.0))
 
-        fan_speed = float((status.get("fan") or {}).get("speed", 0.0))  # 0.0..1.0
+    ps = status.get("print_stats", {})
+    state = (ps.get("state") or "unknown").upper()
 
-        th = status.get("toolhead", {}) or {}
-        pos = th.get("position") or th.get("gcode_position")  # [x, y, z] or [x, y, z, e]
-        if isinstance(pos, (list, tuple)) and len(pos) >= 2:
-            x = float(pos[0]); y = float(pos[1])
-        else:
-            # fallback to motion_report if toolhead missing
-            mr = status.get("motion_report", {}) or {}
-            mpos = mr.get("live_position") or [0.0, 0.0, 0.0, 0.0]
-            x = float(mpos[0] if len(mpos) > 0 else 0.0)
-            y = float(mpos[1] if len(mpos) > 1 else 0.0)
-
-        vel = float(th.get("velocity", 0.0))
-
-        mr = status.get("motion_report", {}) or {}
-        mpos = mr.get("live_position") or [0.0, 0.0, 0.0, 0.0]
-        x = float(mpos[0] if len(mpos) > 0 else 0.0)
-        y = float(mpos[1] if len(mpos) > 1 else 0.0)
-        e = float(mpos[3] if len(mpos) > 3 else 0.0)
-
-        e_vel = float(mr.get("live_extruder_velocity", 0.0)) 
-
-        return ExtruderData(
-            tool=tool.upper(),
-            temp=temp,
-            target=target,
-            fan=fan_speed,
-            status=state,
-            progress=progress_pct,
-            x=x, y=y, vel=vel,
-            e=e, e_vel=e_vel,
-            filename=fname,
-            m117_message=_m117_message,
-            m117_timestamp=_m117_timestamp_mono,
-        )
+    raw_name = ps.get("filename") or ""
+    try:
+        fname = os.path.basename(raw_name) if raw_name else ""
+    except Exception:
+        fname = raw_name or ""
+
+
+    prog = ps.get("progress")
+    if prog is None:
+        prog = status.get("display_status", {}).get("progress", 0.0)
+    # whole percent: the bar's fill, color and redraw key all follow int(progress)
+    progress_pct = float(int(float(prog) * 100.0)) if prog is not None else 0.0
+
+    fan_speed = float((status.get("fan") or {}).get("speed", 0.0))  # 0.0..1.0
+
+    th = status.get("toolhead", {}) or {}
+    vel = float(th.get("velocity", 0.0))
+
+    # XY/E come from motion_report's live position (the commanded toolhead
+    # position lags behind what the printer is actually doing)
+    mr = status.get("motion_report", {}) or {}
+    mpos = mr.get("live_position") or (0.0, 0.0, 0.0, 0.0)
+    n = len(mpos)
+    x = float(mpos[0]) if n > 0 else 0.0
+    y = float(mpos[1]) if n > 1 else 0.0
+    e = float(mpos[3]) if n > 3 else 0.0
+
+    e_vel = float(mr.get("live_extruder_velocity", 0.0)) 
+
+    return ExtruderData(
+        tool=tool.upper(),
+        temp=temp,
+        target=target,
+        fan=fan_speed,
+        status=state,
+        progress=progress_pct,
+        x=x, y=y, vel=vel,
+        e=e, e_vel=e_vel,
+        filename=fname,
+        m117_message=_m117_message,
+        m117_timestamp=_m117_timestamp_mono,
+    )
 
 def needs_redraw(panel_index: int, data: ExtruderData, active: bool, extruder_phase: float) -> bool:
     """Check if panel needs to be redrawn based on data changes"""
-    global _last_frame_data
     
-    # Create a simple hash of the current state
+    # Create a simple hash of the current state, quantized the way render_panel
+    # shows it (temps as ints, XY to 0.1mm) so invisible jitter doesn't redraw.
     # Exclude filename from the redraw state — we reserve the cap area for M117
+    # Angles are keyed by the trig-table step they are drawn with, so phases
+    # that creep while the fan/extruder is (nearly) still don't redraw.
+    fan_on = float(data.fan or 0.0) > 0.01
     current_state = (
-        data.temp, data.target, data.fan, data.status, data.progress,
-        data.x, data.y, data.vel, data.e_vel,
-        data.m117_message, data.m117_timestamp, active, int(extruder_phase * 100)
+        int(data.temp), int(data.target), fan_on,
+        tuple(sc_index(FAN_PHASE + i * (2*math.pi/3)) for i in range(3)),
+        active, data.m117_message, int(data.progress),
     )
+    if active:
+        # orbit + XY readout are only drawn on the active panel; the trail
+        # length saturates at |e_vel| = 1
+        current_state += (
+            f"{data.x:.1f}", f"{data.y:.1f}", round(clamp(data.e_vel, -1.0, 1.0), 2),
+            sc_index(extruder_phase),
+        )
     
     # Check if anything changed
     if _last_frame_data[panel_index] != current_state:
@@ -810,7 +1226,7 @@ def needs_redraw(panel_index: int, data: ExtruderData, active: bool, extruder_ph
     return False
 
 def process_m117_messages(gcode_responses: list) -> bool:
-    global _m117_message, _m117_timestamp_mono, _last_m117_message, _last_m117_timestamp, _cached_frames, _last_seen_gcode_time, _cap_cache
+    global _m117_message, _m117_timestamp_mono, _last_m117_message, _last_m117_timestamp, _last_seen_gcode_time
 
     now_mono = time.monotonic()
     changed = False
@@ -823,9 +1239,20 @@ def process_m117_messages(gcode_responses: list) -> bool:
         # don't clear cached frames here; let needs_redraw drive re-rendering
         return True
 
-    # 2) ignore historical repeats by only processing strictly-new gcode times
+    # 2) ignore historical repeats by only processing strictly-new gcode times;
+    #    the store is oldest-first, so walk back from the end to the cursor
+    start = len(gcode_responses)
+    if _last_seen_gcode_time is not None:
+        while start > 0:
+            rtime = gcode_responses[start - 1].get("time")
+            if rtime is not None and rtime <= _last_seen_gcode_time:
+                break
+            start -= 1
+    else:
+        start = 0
+
     newest_resp_time = _last_seen_gcode_time
-    for resp in gcode_responses:
+    for resp in gcode_responses[start:]:
         msg = (resp.get("message") or "").strip()
         rtime = resp.get("time")  # Moonraker server time (monotonic since start)
         if rtime is None:
@@ -833,9 +1260,8 @@ def process_m117_messages(gcode_responses: list) -> bool:
         if _last_seen_gcode_time is not None and rtime <= _last_seen_gcode_time:
             continue  # already processed this or older
 
-        if msg.upper().startswith("M117"):
-            parts = msg.split(" ", 1)
-            display_msg = parts[1].strip() if len(parts) > 1 else ""
+        if msg[:4].upper() == "M117":
+            display_msg = msg.partition(" ")[2].strip()
             # Empty -> clear
             if not display_msg:
                 if _m117_message is not None:
@@ -844,8 +1270,6 @@ def process_m117_messages(gcode_responses: list) -> bool:
                     _last_m117_timestamp = now_mono
                     _m117_timestamp_mono = 0.0
                     changed = True
-                    # clear cap cache so the UI will rebuild the fallback filename cap
-                    _cap_cache = [None, None]
             else:
                 # Only update if truly different from the currently displayed message
                 if display_msg != _m117_message:
@@ -854,8 +1278,6 @@ def process_m117_messages(gcode_responses: list) -> bool:
                     _m117_timestamp_mono = now_mono
                     _last_m117_timestamp = now_mono
                     changed = True
-                    # clear cap cache so new cap image will be built
-                    _cap_cache = [None, None]
 
         if newest_resp_time is None or rtime > newest_resp_time:
             newest_resp_time = rtime
@@ -870,16 +1292,21 @@ def process_m117_messages(gcode_responses: list) -> bool:
 
 # ----------------- MAIN -----------------
 def main():
-    global _cached_frames, _last_frame_data  # Add missing global declarations
     period = 1.0 / POLL_HZ
     client = MoonrakerClient(MOONRAKER_URL, timeout=HTTP_TIMEOUT)
+    client.subscribe(SUBSCRIBE_OBJECTS)  # no-op (HTTP polling) without websocket-client
     last_err = None
-    gcode_check_counter = 0  # Only check G-code every few cycles
+    last_gcode_poll = time.monotonic()  # gcode_store is checked on wall time, not ticks
+    # gcode_store is fetched in the background so a slow reply doesn't stall
+    # the animation; the result is picked up on a later tick
+    gcode_pool = ThreadPoolExecutor(max_workers=1)
+    gcode_future = None
 
     display_error_all("INIT", "Waiting for Moonraker...")
 
+    next_t = time.monotonic()  # wake-up deadline for the next tick
     while True:
-        t0 = time.monotonic()
+        tick = period
         try:
             # 1) Check Klipper state first
             ks = client.klippy_state()
@@ -903,12 +1330,11 @@ def main():
                     last_err = (title, msg, phase)
             else:
                 # 2) Normal dashboard: check G-code responses for M117 messages
-                gcode_check_counter += 1
-                if gcode_check_counter >= 5:  # Check every 5 cycles (every 1 second at 5Hz) - more frequent
-                    gcode_responses = client.get_recent_gcode_responses(20)
+                if gcode_future is not None and gcode_future.done():
+                    gcode_responses = gcode_future.result()  # [] on any fetch error
+                    gcode_future = None
                     message_changed = process_m117_messages(gcode_responses)
-                    gcode_check_counter = 0
-                    
+
                     # Debug: Print M117 status
                     if _m117_message:
                         print(f"DEBUG: M117 message active: '{_m117_message}'")
@@ -916,11 +1342,16 @@ def main():
                     # Clear cached frames if message changed
                     if message_changed:
                         print(f"DEBUG: M117 message changed, clearing cache")
-                        _cached_frames = [None, None]
-                
-                data = []
-                for cfg in SCREENS:
-                    data.append(client.query_tool(cfg["tool"]))
+                        _cached_frames[0] = _cached_frames[1] = None
+
+                # Timed rather than counted, so the slow idle tick doesn't delay a new M117
+                if gcode_future is None and time.monotonic() - last_gcode_poll >= GCODE_POLL_INTERVAL:
+                    gcode_future = gcode_pool.submit(client.get_recent_gcode_responses, 20)
+                    last_gcode_poll = time.monotonic()
+
+                # One status fetch serves both tools
+                status = client.query_all()
+                data = [extract_extruder(status, cfg["tool"]) for cfg in SCREENS]
                 
                 active = get_active_tool(VARS_PATH)
 
@@ -953,35 +1384,53 @@ def main():
 
                     # Convert to angular speed (rad/s) using hardware mm-per-rev
                     # ω = 2π * (mm/s) / (mm/rev)
-                    omega = EXTRUDER_SPIN_DIR * (2.0 * math.pi) * (e_vel_s / max(1e-6, MM_PER_REV))
+                    omega = EXTRUDER_RAD_PER_MM * e_vel_s
 
                     # Advance persistent phase and wrap
                     EXTRUDER_PHASE[i] = (EXTRUDER_PHASE[i] + omega * dt) % (2.0 * math.pi)
 
-                # Render and display both panels each cycle (keeps UI consistent)
-                left_land = render_panel(SCREENS[0]["name"], data[0], active=(active == 0), extruder_phase=EXTRUDER_PHASE[0])
-                right_land = render_panel(SCREENS[1]["name"], data[1], active=(active == 1), extruder_phase=EXTRUDER_PHASE[1])
-
-                LEFT.display(to_panel_frame(left_land, flip_180=FLIP_LEFT_180))
-                RIGHT.display(to_panel_frame(right_land, flip_180=False))
+                # Nothing animating or about to change soon: slow down until it does
+                if (rps == 0.0 and _m117_message is None
+                        and all(ed.status != "PRINTING" for ed in data)
+                        and all(abs(v) < 1e-3 for v in EXTRUDER_VEL_EMA)
+                        and all(ed.target <= 0 or abs(ed.temp - ed.target) <= 2 for ed in data)):
+                    tick = 1.0 / IDLE_POLL_HZ
+
+                # Render and push a panel only when what it shows has changed;
+                # otherwise the panel keeps the frame it already has
+                frames = [None, None]
+                for i, cfg in enumerate(SCREENS):
+                    is_active = (active == i)
+                    if needs_redraw(i, data[i], is_active, EXTRUDER_PHASE[i]) or _cached_frames[i] is None:
+                        _cached_frames[i] = render_panel(cfg["name"], data[i], active=is_active, extruder_phase=EXTRUDER_PHASE[i],
+                                                         out=_panel_canvas[i])
+                        frames[i] = to_panel_bytes(_cached_frames[i], flip_180=(i == 0 and FLIP_LEFT_180),
+                                                   scratch=_panel_scratch[i], packed=_panel_packed[i])
+
+                push_frames(frames)
 
                 last_err = None  # clear error
 
         except Exception as e:
             # Network/parse/etc → show generic RED error
             title = "MOONRAKER ERROR"
-            msg = f"{e.__class__.__name__}: {str(e)}"
-            tb_last = traceback.format_exc().strip().splitlines()[-1]
-            if tb_last and tb_last not in msg:
-                msg = f"{msg} | {tb_last}"
+            msg = f"{type(e).__name__}: {str(e)}"
+            # Moonraker being down fails every tick; only format the traceback
+            # when the error actually changes what's on screen
             if (title, msg) != last_err:
-                display_error_all(title, msg[:220])
                 last_err = (title, msg)
+                tb_last = traceback.format_exc().strip().splitlines()[-1]
+                if tb_last and tb_last not in msg:
+                    msg = f"{msg} | {tb_last}"
+                display_error_all(title, msg[:220])
 
-        # pace
-        dt = time.monotonic() - t0
-        if dt < period:
-            time.sleep(period - dt)
+        # pace on a fixed schedule so work time isn't added on top of the period
+        next_t += tick
+        slack = next_t - time.monotonic()
+        if slack > 0:
+            time.sleep(slack)
+        else:
+            next_t = time.monotonic()  # overran: resync instead of bursting to catch up
 
 if __name__ == "__main__":
     main()
\ No newline at end of file